@@ -3,36 +3,158 @@ import {
   html,
 } from 'https://cdn.jsdelivr.net/gh/lit/dist@3/core/lit-core.min.js';
 
+// A refresh that has not landed after this long is treated as lost.
+const STALE_REFRESH_MS = 5000;
+// Refresh at least this often when listening for server state changes, or
+// at the polling interval if that is longer.
+const KEEPALIVE_REFRESH_MS = 10000;
+// Browsers allow about six HTTP/1.1 connections per origin, and Mesop's own
+// streaming requests share them, so one /state/events stream is shared by
+// every tab: the tab holding this lock opens it and relays its events to the
+// others over a BroadcastChannel of the same name.
+const STATE_EVENTS_CHANNEL = 'a2a-state-events';
+
 class AsyncPoller extends LitElement {
   static properties = {
     triggerEvent: {type: String},
     action: {type: Object},
     polling_interval: {type: Number},
+    refresh_count: {type: Number},
   };
 
   render() {
     return html`<div></div>`;
   }
 
-  firstUpdated() {
+  connectedCallback() {
+    super.connectedCallback();
+    if (this.hasUpdated) {
+      this.start();
+    }
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this.stop();
+  }
+
+  updated(changedProperties) {
+    if (changedProperties.has('polling_interval')) {
+      this.start();
+    }
+    // The server bumps refresh_count once a refresh has been applied.
+    if (changedProperties.has('refresh_count')) {
+      this.pendingSince = 0;
+      if (this.refreshQueued) {
+        this.refreshQueued = false;
+        this.requestRefresh();
+      }
+    }
+  }
+
+  start() {
+    this.stop();
     if (this.polling_interval <= 0) {
       return;
     }
-    if (this.action) {
-      setTimeout(() => {
-        this.runTimeout(this.action)
-      }, this.polling_interval * 1000);
+    if (!this.action) {
+      return;
+    }
+    // Load the current state now rather than waiting on the first event.
+    this.requestRefresh();
+    if (window.EventSource) {
+      // Refresh when the server reports a state change, with a slow
+      // keepalive refresh in case an update is missed.
+      if (window.BroadcastChannel && navigator.locks) {
+        this.listenShared();
+      } else {
+        this.stateEvents = new EventSource('/state/events');
+        this.stateEvents.onmessage = () => {
+          this.requestRefresh();
+        };
+      }
+      this.keepalive = setInterval(
+        () => {
+          this.requestRefresh();
+        },
+        Math.max(KEEPALIVE_REFRESH_MS, this.polling_interval * 1000),
+      );
+      return;
+    }
+    this.timeout = setTimeout(() => {
+      this.runTimeout();
+    }, this.polling_interval * 1000);
+  }
+
+  stop() {
+    clearTimeout(this.timeout);
+    clearInterval(this.keepalive);
+    if (this.stateEvents) {
+      this.stateEvents.close();
+      this.stateEvents = null;
+    }
+    if (this.releaseLock) {
+      this.releaseLock();
+      this.releaseLock = null;
+    }
+    if (this.lockRequest) {
+      this.lockRequest.abort();
+      this.lockRequest = null;
+    }
+    if (this.channel) {
+      this.channel.close();
+      this.channel = null;
     }
   }
 
-  runTimeout(action) {
+  listenShared() {
+    const channel = new BroadcastChannel(STATE_EVENTS_CHANNEL);
+    channel.onmessage = () => {
+      this.requestRefresh();
+    };
+    this.channel = channel;
+    // Wait for the lock, then hold it and the stream until stopped. When the
+    // holding tab closes or disables polling, the next waiting tab takes over.
+    this.lockRequest = new AbortController();
+    navigator.locks
+      .request(
+        STATE_EVENTS_CHANNEL,
+        {signal: this.lockRequest.signal},
+        () =>
+          new Promise((resolve) => {
+            this.stateEvents = new EventSource('/state/events');
+            this.stateEvents.onmessage = (event) => {
+              channel.postMessage(event.data);
+              this.requestRefresh();
+            };
+            this.releaseLock = resolve;
+          }),
+      )
+      .catch(() => {
+        // Aborted by stop() while still waiting for the lock.
+      });
+  }
+
+  requestRefresh() {
+    // While a refresh is in flight, hold at most one more rather than
+    // building up a queue of stale refreshes behind a slow backend.
+    const now = Date.now();
+    if (this.pendingSince && now - this.pendingSince <= STALE_REFRESH_MS) {
+      this.refreshQueued = true;
+      return;
+    }
+    this.pendingSince = now;
     this.dispatchEvent(
       new MesopEvent(this.triggerEvent, {
-        action: action,
+        action: this.action,
       }),
     );
+  }
+
+  runTimeout() {
+    this.requestRefresh();
     if (this.polling_interval > 0) {
-      setTimeout(() => {
+      this.timeout = setTimeout(() => {
         this.runTimeout();
       }, this.polling_interval * 1000);
     }
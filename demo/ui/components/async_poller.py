@@ -1,5 +1,5 @@
 from collections.abc import Callable
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from typing import Any
 
 import mesop.labs as mel
@@ -7,11 +7,22 @@ import mesop.labs as mel
 from state.state import AppState
 
 
-@dataclass
+@dataclass(slots=True)
 class AsyncAction:
     value: AppState
     duration_seconds: int
 
+    def to_wire(self) -> dict[str, Any]:
+        """Returns the part of the action the web component needs.
+
+        The component only echoes the action back with its event, so there is
+        no need to serialize the whole AppState into it on every render.
+        """
+        return {
+            'duration_seconds': self.duration_seconds,
+            'refresh_count': self.value.refresh_count,
+        }
+
 
 @mel.web_component(path='./async_poller.js')
 def async_poller(
@@ -45,6 +56,7 @@ def async_poller(
         },
         properties={
             'polling_interval': action.duration_seconds if action else 1,
-            'action': asdict(action) if action else {},
+            'refresh_count': action.value.refresh_count if action else 0,
+            'action': action.to_wire() if action else {},
         },
     )
@@ -61,6 +61,9 @@ async def send_message(message: str, message_id: str = ''):
     )
     if conversation:
         conversation.message_ids.append(state_message.message_id)
+    # Fetch the full state bundle on the next refresh, even if it has not
+    # changed on the server, so it replaces these local entries.
+    app_state.state_bundle_etag = ''
     await SendMessage(request)
 
 
@@ -312,6 +312,8 @@ async def cancel_form(e: me.ClickEvent):
     form_message_id, task_id = key_parts[0], key_parts[1]
     app_state.form_responses[message_id] = form_message_id
     app_state.background_tasks[message_id] = ''
+    # Refetch the state bundle so the server's pending messages replace this.
+    app_state.state_bundle_etag = ''
     app_state.completed_forms[form_message_id] = None
     request = Message(
         message_id=message_id,
@@ -328,6 +330,8 @@ async def send_response(
 ):
     message_id = str(uuid.uuid4())
     app_state.background_tasks[message_id] = ''
+    # Refetch the state bundle so the server's pending messages replace this.
+    app_state.state_bundle_etag = ''
     app_state.form_responses[message_id] = id
     form = FormState(**json.loads(state.forms[id]))
     print('Sending form response', form)
@@ -20,6 +20,7 @@ async def refresh_app_state(e: mel.WebEvent):  # pylint: disable=unused-argument
     yield
     app_state = me.state(AppState)
     await UpdateAppState(app_state, app_state.current_conversation_id)
+    app_state.refresh_count += 1
     yield
 
 
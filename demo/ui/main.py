@@ -3,6 +3,7 @@ run:
   uv main.py
 """
 
+import asyncio
 import os
 import sys
 
@@ -31,6 +32,7 @@ from state.state import AppState
 
 
 load_dotenv()
+host_agent_service.load_environment()
 
 
 def on_load(e: me.LoadEvent):  # pylint: disable=unused-argument
@@ -44,15 +46,10 @@ def on_load(e: me.LoadEvent):  # pylint: disable=unused-argument
 
     # check if the API key is set in the environment
     # and if the user is using Vertex AI
-    uses_vertex_ai = (
-        os.getenv('GOOGLE_GENAI_USE_VERTEXAI', '').upper() == 'TRUE'
-    )
-    api_key = os.getenv('GOOGLE_API_KEY', '')
-
-    if uses_vertex_ai:
+    if host_agent_service.env_uses_vertex_ai:
         state.uses_vertex_ai = True
-    elif api_key:
-        state.api_key = api_key
+    elif host_agent_service.env_api_key:
+        state.api_key = host_agent_service.env_api_key
     else:
         # Show the API key dialog if both are not set
         state.api_key_dialog_open = True
@@ -149,7 +146,12 @@ class HTTPXClientWrapper:
 
     def start(self):
         """Instantiate the client. Call from the FastAPI startup hook."""
-        self.async_client = httpx.AsyncClient(timeout=30)
+        self.async_client = httpx.AsyncClient(
+            timeout=30,
+            # Keep idle connections past the slowest UI polling interval (30s)
+            # so each poll reuses a warm connection.
+            limits=httpx.Limits(keepalive_expiry=60),
+        )
 
     async def stop(self):
         """Gracefully shutdown. Call from FastAPI shutdown hook."""
@@ -171,6 +173,9 @@ agent_server = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     httpx_client_wrapper.start()
+    host_agent_service.init_client(
+        httpx_client_wrapper(), asyncio.get_running_loop()
+    )
     global agent_server
     agent_server = ConversationServer(app, httpx_client_wrapper())
     app.openapi_schema = None
@@ -184,6 +189,7 @@ async def lifespan(app: FastAPI):
     )
     app.setup()
     yield
+    await agent_server.close()
     await httpx_client_wrapper.stop()
 
 
@@ -204,5 +210,10 @@ if __name__ == '__main__':
         host=host,
         port=port,
         timeout_graceful_shutdown=0,
+        # Outlive the client's 60s keepalive_expiry so idle polling
+        # connections are not closed by the server first.
+        timeout_keep_alive=75,
+        # libuv-backed loop for the HTTP and polling paths; not available on Windows
+        loop='asyncio' if sys.platform == 'win32' else 'uvloop',
         reload=False  # Disable auto-reload
     )
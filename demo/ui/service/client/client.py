@@ -1,9 +1,11 @@
-import json
+import asyncio
 
-from typing import Any
+from typing import Any, TypeVar
 
 import httpx
 
+from pydantic import ValidationError
+
 from service.types import (
     AgentClientHTTPError,
     AgentClientJSONError,
@@ -11,7 +13,10 @@ from service.types import (
     CreateConversationResponse,
     GetEventRequest,
     GetEventResponse,
+    GetStateBundleRequest,
+    GetStateBundleResponse,
     JSONRPCRequest,
+    JSONRPCResponse,
     ListAgentRequest,
     ListAgentResponse,
     ListConversationRequest,
@@ -29,63 +34,126 @@ from service.types import (
 )
 
 
+ResponseT = TypeVar('ResponseT', bound=JSONRPCResponse)
+
+
 class ConversationClient:
-    def __init__(self, base_url):
+    def __init__(
+        self,
+        base_url,
+        http_client: httpx.AsyncClient | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ):
         self.base_url = base_url.rstrip('/')
+        # Optional pooled client shared with the server, and the event loop it
+        # is bound to. Without one, each request opens a throwaway client.
+        self._http_client = http_client
+        self._loop = loop
 
     async def send_message(
         self, payload: SendMessageRequest
     ) -> SendMessageResponse:
-        return SendMessageResponse(**await self._send_request(payload))
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.base_url + '/' + request.method,
-                    json=request.model_dump(mode='json', exclude_none=True),
-                )
+        return await self._send_request(payload, SendMessageResponse)
+
+    async def _send_request(
+        self, request: JSONRPCRequest, response_type: type[ResponseT]
+    ) -> ResponseT:
+        return self._decode(await self._post_request(request), response_type)
+
+    async def _post_request(
+        self, request: JSONRPCRequest, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        # Encode and decode the raw bytes with pydantic directly rather than
+        # going through an intermediate dict and the stdlib json module.
+        try:
+            response = await self._post(
+                '/' + request.method,
+                content=request.model_dump_json(exclude_none=True),
+                headers={'Content-Type': 'application/json', **(headers or {})},
+            )
+            if response.status_code != httpx.codes.NOT_MODIFIED:
                 response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                print('http error', e)
-                raise AgentClientHTTPError(
-                    e.response.status_code, str(e)
-                ) from e
-            except json.JSONDecodeError as e:
-                print('decode error', e)
-                raise AgentClientJSONError(str(e)) from e
+            return response
+        except httpx.HTTPStatusError as e:
+            print('http error', e)
+            raise AgentClientHTTPError(e.response.status_code, str(e)) from e
+
+    @staticmethod
+    def _decode(
+        response: httpx.Response, response_type: type[ResponseT]
+    ) -> ResponseT:
+        try:
+            return response_type.model_validate_json(response.content)
+        except ValidationError as e:
+            print('decode error', e)
+            raise AgentClientJSONError(str(e)) from e
+
+    async def _post(self, path: str, **kwargs: Any) -> httpx.Response:
+        if self._http_client is None:
+            async with httpx.AsyncClient() as client:
+                return await client.post(self.base_url + path, **kwargs)
+        post = self._http_client.post(self.base_url + path, **kwargs)
+        if self._loop is None or asyncio.get_running_loop() is self._loop:
+            return await post
+        # Mesop runs event handlers on their own event loops, while the shared
+        # client's connections belong to the server loop, so run it there.
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(post, self._loop)
+        )
+
+    async def update_api_key(self, api_key: str) -> None:
+        response = await self._post(
+            '/api_key/update', json={'api_key': api_key}
+        )
+        response.raise_for_status()
 
     async def create_conversation(
         self, payload: CreateConversationRequest
     ) -> CreateConversationResponse:
-        return CreateConversationResponse(**await self._send_request(payload))
+        return await self._send_request(payload, CreateConversationResponse)
 
     async def list_conversation(
         self, payload: ListConversationRequest
     ) -> ListConversationResponse:
-        return ListConversationResponse(**await self._send_request(payload))
+        return await self._send_request(payload, ListConversationResponse)
 
     async def get_events(self, payload: GetEventRequest) -> GetEventResponse:
-        return GetEventResponse(**await self._send_request(payload))
+        return await self._send_request(payload, GetEventResponse)
 
     async def list_messages(
         self, payload: ListMessageRequest
     ) -> ListMessageResponse:
-        return ListMessageResponse(**await self._send_request(payload))
+        return await self._send_request(payload, ListMessageResponse)
 
     async def get_pending_messages(
         self, payload: PendingMessageRequest
     ) -> PendingMessageResponse:
-        return PendingMessageResponse(**await self._send_request(payload))
+        return await self._send_request(payload, PendingMessageResponse)
 
     async def list_tasks(self, payload: ListTaskRequest) -> ListTaskResponse:
-        return ListTaskResponse(**await self._send_request(payload))
+        return await self._send_request(payload, ListTaskResponse)
+
+    async def get_state_bundle(
+        self, payload: GetStateBundleRequest, etag: str = ''
+    ) -> tuple[GetStateBundleResponse | None, str]:
+        """Returns the state bundle and its ETag.
+
+        The bundle is None when the server's copy still matches etag.
+        """
+        response = await self._post_request(
+            payload, {'If-None-Match': etag} if etag else None
+        )
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return None, etag
+        return (
+            self._decode(response, GetStateBundleResponse),
+            response.headers.get('ETag', ''),
+        )
 
     async def register_agent(
         self, payload: RegisterAgentRequest
     ) -> RegisterAgentResponse:
-        return RegisterAgentResponse(**await self._send_request(payload))
+        return await self._send_request(payload, RegisterAgentResponse)
 
     async def list_agents(self, payload: ListAgentRequest) -> ListAgentResponse:
-        return ListAgentResponse(**await self._send_request(payload))
+        return await self._send_request(payload, ListAgentResponse)
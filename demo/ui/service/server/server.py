@@ -1,32 +1,65 @@
 import asyncio
 import base64
+import contextlib
+import hashlib
 import os
 import threading
+import time
 import uuid
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import cast
 
 import httpx
 
 from a2a.types import FilePart, FileWithUri, Message, Part
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 from service.types import (
     CreateConversationResponse,
     GetEventResponse,
+    GetStateBundleResponse,
+    JSONRPCError,
+    JSONRPCResponse,
     ListAgentResponse,
     ListConversationResponse,
+    ListMessageRequest,
     ListMessageResponse,
     ListTaskResponse,
     MessageInfo,
     PendingMessageResponse,
     RegisterAgentResponse,
     SendMessageResponse,
+    StateBundle,
 )
 
 from .adk_host_manager import ADKHostManager, get_message_id
 from .application_manager import ApplicationManager
 from .in_memory_manager import InMemoryFakeAgentManager
+from .state_hub import StateHub
+
+
+# How long an encoded poll response is reused. Matches the shortest UI
+# polling interval, so every session polling in the same tick shares one
+# serialization of the manager state.
+RESPONSE_CACHE_TTL_SECONDS = 1.0
+
+# Longest a /state/events stream stays silent before sending a keepalive.
+STATE_EVENTS_KEEPALIVE_SECONDS = 10
+
+
+def encode_response(key: str, response: JSONRPCResponse) -> tuple[bytes, str]:
+    """Encodes the response to JSON and derives an ETag from the bytes.
+
+    Responses get a fresh random id when built, so the id is pinned to key
+    first; otherwise the ETag would change on every build even when the
+    result has not.
+    """
+    content = response.model_copy(update={'id': key}).model_dump_json().encode()
+    return content, f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
 
 
 class ConversationServer:
@@ -56,6 +89,16 @@ class ConversationServer:
             self.manager = InMemoryFakeAgentManager()
         self._file_cache = {}  # dict[str, FilePart] maps file id to message data
         self._message_to_cache = {}  # dict[str, str] maps message id to cache id
+        # dict[str, tuple[float, asyncio.Future[tuple[bytes, str]]]] maps
+        # route to (encode time, (body, etag))
+        self._response_cache = {}
+        # Poll responses are encoded off the event loop, one at a time.
+        self._encoder = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='response-encoder'
+        )
+        # Publishes state bundle ETag changes to /state/events subscribers.
+        self._state_hub = StateHub()
+        self._state_watcher: asyncio.Task | None = None
 
         app.add_api_route(
             '/conversation/create', self._create_conversation, methods=['POST']
@@ -72,6 +115,8 @@ class ConversationServer:
             '/message/pending', self._pending_messages, methods=['POST']
         )
         app.add_api_route('/task/list', self._list_tasks, methods=['POST'])
+        app.add_api_route('/state/bundle', self._state_bundle, methods=['POST'])
+        app.add_api_route('/state/events', self._state_events, methods=['GET'])
         app.add_api_route(
             '/agent/register', self._register_agent, methods=['POST']
         )
@@ -88,8 +133,65 @@ class ConversationServer:
         if isinstance(self.manager, ADKHostManager):
             self.manager.update_api_key(api_key)
 
+    async def close(self):
+        """Stops the state watcher and the response encoder thread."""
+        if self._state_watcher is not None:
+            self._state_watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._state_watcher
+            self._state_watcher = None
+        self._encoder.shutdown(cancel_futures=True)
+
+    async def _cached_response(
+        self,
+        key: str,
+        build: Callable[[], JSONRPCResponse],
+        request: Request | None = None,
+    ) -> Response:
+        """Returns the encoded response for key, reusing it within a tick.
+
+        It carries an ETag, and a request whose If-None-Match still matches
+        gets a 304.
+        """
+        content, etag = await self._encode_cached(key, build)
+        headers = {'ETag': etag}
+        if request and request.headers.get('If-None-Match') == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=content, media_type='application/json', headers=headers
+        )
+
+    async def _encode_cached(
+        self, key: str, build: Callable[[], JSONRPCResponse]
+    ) -> tuple[bytes, str]:
+        """Returns the encoded body and ETag for key, reusing it within a tick.
+
+        The response is built and encoded on the encoder thread, and callers
+        arriving while that is in progress wait on the same result.
+        """
+        now = time.monotonic()
+        cached = self._response_cache.get(key)
+        if cached and now - cached[0] < RESPONSE_CACHE_TTL_SECONDS:
+            body = cached[1]
+        else:
+            body = asyncio.get_running_loop().run_in_executor(
+                self._encoder, lambda: encode_response(key, build())
+            )
+            self._response_cache[key] = (now, body)
+        try:
+            # Shielded so one cancelled request does not cancel the others.
+            return await asyncio.shield(body)
+        except Exception:
+            if self._response_cache.get(key, (0, None))[1] is body:
+                del self._response_cache[key]
+            raise
+
+    def _invalidate_responses(self):
+        self._response_cache.clear()
+
     async def _create_conversation(self):
         c = await self.manager.create_conversation()
+        self._invalidate_responses()
         return CreateConversationResponse(result=c)
 
     async def _send_message(self, request: Request):
@@ -110,6 +212,7 @@ class ConversationServer:
                 )
             )
         t.start()
+        self._invalidate_responses()
         return SendMessageResponse(
             result=MessageInfo(
                 message_id=message.message_id,
@@ -119,11 +222,22 @@ class ConversationServer:
 
     async def _list_messages(self, request: Request):
         message_data = await request.json()
-        conversation_id = message_data['params']
+        try:
+            params = ListMessageRequest.model_validate(message_data).params
+        except ValidationError as e:
+            return ListMessageResponse(
+                id=message_data.get('id'),
+                error=JSONRPCError(code=-32602, message=str(e)),
+            )
+        if isinstance(params, str):
+            conversation_id, offset = params, 0
+        else:
+            conversation_id, offset = params.conversation_id, params.offset
         conversation = self.manager.get_conversation(conversation_id)
         if conversation:
+            # Messages are append only, so the caller only needs the tail.
             return ListMessageResponse(
-                result=self.cache_content(conversation.messages)
+                result=self.cache_content(conversation.messages[offset:])
             )
         return ListMessageResponse(result=[])
 
@@ -164,23 +278,109 @@ class ConversationServer:
         return rval
 
     async def _pending_messages(self):
-        return PendingMessageResponse(
-            result=self.manager.get_pending_messages()
+        return await self._cached_response(
+            'message/pending',
+            lambda: PendingMessageResponse(
+                result=self.manager.get_pending_messages()
+            ),
         )
 
-    def _list_conversation(self):
-        return ListConversationResponse(result=self.manager.conversations)
+    async def _list_conversation(self):
+        return await self._cached_response(
+            'conversation/list',
+            lambda: ListConversationResponse(result=self.manager.conversations),
+        )
 
     def _get_events(self):
         return GetEventResponse(result=self.manager.events)
 
-    def _list_tasks(self):
-        return ListTaskResponse(result=self.manager.tasks)
+    async def _list_tasks(self):
+        return await self._cached_response(
+            'task/list', lambda: ListTaskResponse(result=self.manager.tasks)
+        )
+
+    async def _state_bundle(self, request: Request):
+        return await self._cached_response(
+            'state/bundle', self._build_state_bundle, request
+        )
+
+    async def _state_events(self, request: Request):
+        return StreamingResponse(
+            self._stream_state_events(request),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
+
+    async def _stream_state_events(self, request: Request):
+        """Sends the state bundle ETag each time it changes.
+
+        A comment line goes out after STATE_EVENTS_KEEPALIVE_SECONDS without a
+        change, which keeps the connection open and notices disconnects.
+        """
+        with self._state_hub.subscribe() as updates:
+            if self._state_watcher is None or self._state_watcher.done():
+                self._state_watcher = asyncio.create_task(self._watch_state())
+            while not await request.is_disconnected():
+                try:
+                    etag = await asyncio.wait_for(
+                        updates.get(), STATE_EVENTS_KEEPALIVE_SECONDS
+                    )
+                except TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'data: {etag}\n\n'
+
+    async def _watch_state(self):
+        """Checks the state bundle every tick and publishes when it changes.
+
+        The managers update state in place from many places and threads, so
+        changes are found by comparing bundle ETags rather than hooked. This
+        is the single producer for every subscriber, it shares the per-tick
+        encode with the state/bundle endpoint, and it stops once the last
+        subscriber leaves.
+
+        It compares against the hub's latest ETag rather than its own copy:
+        subscribers have already been sent that one, and the hub forgets it
+        when the last subscriber leaves, so one that reconnects before the
+        watcher notices still gets the current ETag.
+        """
+        while self._state_hub.subscriber_count:
+            try:
+                _, etag = await self._encode_cached(
+                    'state/bundle', self._build_state_bundle
+                )
+            except Exception as e:
+                print('Failed to check state', e)
+            else:
+                if etag != self._state_hub.latest:
+                    self._state_hub.publish(etag)
+            await asyncio.sleep(RESPONSE_CACHE_TTL_SECONDS)
+
+    def _build_state_bundle(self) -> GetStateBundleResponse:
+        return GetStateBundleResponse(result=self._read_state_bundle())
+
+    def _read_state_bundle(self) -> StateBundle:
+        # Read each field on its own so one failure does not hide the rest.
+        readers = {
+            'conversations': lambda: self.manager.conversations,
+            'tasks': lambda: self.manager.tasks,
+            'pending_messages': lambda: dict(
+                self.manager.get_pending_messages()
+            ),
+        }
+        values = {}
+        for name, read in readers.items():
+            try:
+                values[name] = read()
+            except Exception as e:
+                print(f'Failed to read {name}', e)
+        return StateBundle(**values)
 
     async def _register_agent(self, request: Request):
         message_data = await request.json()
         url = message_data['params']
         self.manager.register_agent(url)
+        self._invalidate_responses()
         return RegisterAgentResponse()
 
     async def _list_agents(self):
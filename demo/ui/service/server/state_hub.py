@@ -0,0 +1,54 @@
+import asyncio
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class StateHub:
+    """StateHub fans out state change notifications to every subscriber.
+
+    One producer publishes each change once and every subscriber reads it from
+    its own small queue. When a slow subscriber's queue is full the oldest
+    notification is dropped, so memory stays bounded however many clients are
+    connected and however far behind they fall.
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self._maxsize = maxsize
+        self._subscribers: set[asyncio.Queue[str]] = set()
+        self._latest: str | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def latest(self) -> str | None:
+        return self._latest
+
+    def publish(self, message: str):
+        self._latest = message
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue[str]]:
+        """Registers a queue for the duration of the block.
+
+        The queue starts with the latest message, if any, so a new subscriber
+        does not wait for the next change to learn the current state. The
+        latest message is forgotten when the last subscriber leaves, since
+        nothing keeps it current while no one is listening.
+        """
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self._maxsize)
+        if self._latest is not None:
+            queue.put_nowait(self._latest)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                self._latest = None
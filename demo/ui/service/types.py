@@ -51,10 +51,16 @@ class SendMessageRequest(JSONRPCRequest):
     params: Message
 
 
+class ListMessageParams(BaseModel):
+    conversation_id: str
+    # Number of messages the caller already holds; only later ones are listed.
+    offset: int = Field(0, ge=0)
+
+
 class ListMessageRequest(JSONRPCRequest):
     method: Literal['message/list'] = 'message/list'
-    # This is the conversation id
-    params: str
+    # This is the conversation id, or the id with an offset to list from
+    params: str | ListMessageParams
 
 
 class ListMessageResponse(JSONRPCResponse):
@@ -110,6 +116,21 @@ class ListTaskResponse(JSONRPCResponse):
     result: list[Task] | None = None
 
 
+class StateBundle(BaseModel):
+    # Each field is None when the server failed to read it.
+    conversations: list[Conversation] | None = None
+    tasks: list[Task] | None = None
+    pending_messages: dict[str, str] | None = None
+
+
+class GetStateBundleRequest(JSONRPCRequest):
+    method: Literal['state/bundle'] = 'state/bundle'
+
+
+class GetStateBundleResponse(JSONRPCResponse):
+    result: StateBundle | None = None
+
+
 class RegisterAgentRequest(JSONRPCRequest):
     method: Literal['agent/register'] = 'agent/register'
     # This is the base url of the agent card
@@ -1,4 +1,5 @@
-import json
+import asyncio
+import operator
 import os
 import sys
 import traceback
@@ -6,21 +7,25 @@ import uuid
 
 from typing import Any
 
+import httpx
+
 from a2a.types import FileWithBytes, Message, Part, Role, Task, TaskState
+from pydantic_core import to_json
 from service.client.client import ConversationClient
 from service.types import (
     Conversation,
     CreateConversationRequest,
     Event,
     GetEventRequest,
+    GetStateBundleRequest,
     ListAgentRequest,
     ListConversationRequest,
+    ListMessageParams,
     ListMessageRequest,
-    ListTaskRequest,
     MessageInfo,
-    PendingMessageRequest,
     RegisterAgentRequest,
     SendMessageRequest,
+    StateBundle,
 )
 
 from .state import (
@@ -35,9 +40,42 @@ from .state import (
 
 server_url = 'http://127.0.0.1:12000'
 
+# Upper bound on one state refresh, so a slow backend cannot stall polling.
+UPDATE_TIMEOUT_SECONDS = 5
+
+# Credentials from the environment. They are process constants, so they are
+# read once by load_environment and kept current by UpdateApiKey rather than
+# looked up on every page load.
+env_uses_vertex_ai = False
+env_api_key = ''
+
+# Shared client installed by init_client once the server is up.
+_client: ConversationClient | None = None
+
+
+def init_client(
+    http_client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop
+) -> None:
+    """Routes all service calls through the server's pooled http client."""
+    global _client
+    _client = ConversationClient(server_url, http_client, loop)
+
+
+def load_environment() -> None:
+    """Reads the Vertex AI flag and API key from the environment."""
+    global env_uses_vertex_ai, env_api_key
+    env_uses_vertex_ai = (
+        os.getenv('GOOGLE_GENAI_USE_VERTEXAI', '').upper() == 'TRUE'
+    )
+    env_api_key = os.getenv('GOOGLE_API_KEY', '')
+
+
+def _get_client() -> ConversationClient:
+    return _client or ConversationClient(server_url)
+
 
 async def ListConversations() -> list[Conversation]:
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         response = await client.list_conversation(ListConversationRequest())
         return response.result if response.result else []
@@ -47,7 +85,7 @@ async def ListConversations() -> list[Conversation]:
 
 
 async def SendMessage(message: Message) -> Message | MessageInfo | None:
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         response = await client.send_message(SendMessageRequest(params=message))
         return response.result
@@ -58,7 +96,7 @@ async def SendMessage(message: Message) -> Message | MessageInfo | None:
 
 
 async def CreateConversation() -> Conversation:
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         response = await client.create_conversation(CreateConversationRequest())
         return (
@@ -72,7 +110,7 @@ async def CreateConversation() -> Conversation:
 
 
 async def ListRemoteAgents():
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         response = await client.list_agents(ListAgentRequest())
         return response.result
@@ -81,7 +119,7 @@ async def ListRemoteAgents():
 
 
 async def AddRemoteAgent(path: str):
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         await client.register_agent(RegisterAgentRequest(params=path))
     except Exception as e:
@@ -89,7 +127,7 @@ async def AddRemoteAgent(path: str):
 
 
 async def GetEvents() -> list[Event]:
-    client = ConversationClient(server_url)
+    client = _get_client()
     try:
         response = await client.get_events(GetEventRequest())
         return response.result if response.result else []
@@ -98,34 +136,40 @@ async def GetEvents() -> list[Event]:
     return []
 
 
-async def GetProcessingMessages():
-    client = ConversationClient(server_url)
-    try:
-        response = await client.get_pending_messages(PendingMessageRequest())
-        return dict(response.result)
-    except Exception as e:
-        print('Error getting pending messages', e)
-
-
 def GetMessageAliases():
     return {}
 
 
-async def GetTasks():
-    client = ConversationClient(server_url)
+async def GetStateBundle(etag: str = '') -> tuple[StateBundle | None, str]:
+    """Fetches conversations, tasks and pending messages in one request.
+
+    Returns the bundle and its ETag; the bundle is None if it still matches
+    etag.
+    """
+    client = _get_client()
     try:
-        response = await client.list_tasks(ListTaskRequest())
-        return response.result
+        response, etag = await client.get_state_bundle(
+            GetStateBundleRequest(), etag
+        )
+        if response is None:
+            return None, etag
+        return response.result if response.result else StateBundle(), etag
     except Exception as e:
-        print('Failed to list tasks ', e)
-    return []
+        print('Failed to get state bundle ', e)
+    return StateBundle(), etag
 
 
-async def ListMessages(conversation_id: str) -> list[Message]:
-    client = ConversationClient(server_url)
+async def ListMessages(conversation_id: str, offset: int = 0) -> list[Message]:
+    client = _get_client()
     try:
         response = await client.list_messages(
-            ListMessageRequest(params=conversation_id)
+            ListMessageRequest(
+                params=ListMessageParams(
+                    conversation_id=conversation_id, offset=offset
+                )
+                if offset
+                else conversation_id
+            )
         )
         return response.result if response.result else []
     except Exception as e:
@@ -136,30 +180,60 @@ async def ListMessages(conversation_id: str) -> list[Message]:
 async def UpdateAppState(state: AppState, conversation_id: str):
     """Update the app state."""
     try:
+        offset = 0
         if conversation_id:
             state.current_conversation_id = conversation_id
-            messages = await ListMessages(conversation_id)
-            if not messages:
-                state.messages = []
-            else:
-                state.messages = [convert_message_to_state(x) for x in messages]
-        conversations = await ListConversations()
-        if not conversations:
-            state.conversations = []
-        else:
-            state.conversations = [
-                convert_conversation_to_state(x) for x in conversations
-            ]
-
-        state.task_list = []
-        for task in await GetTasks():
-            state.task_list.append(
+            # Only fetch the messages added since the last sync; a full list is
+            # fetched on a conversation switch or if the local list was reset.
+            offset = (
+                state.synced_message_count
+                if state.synced_conversation_id == conversation_id
+                and state.synced_message_count <= len(state.messages)
+                else 0
+            )
+        messages_task = None
+        try:
+            async with asyncio.timeout(UPDATE_TIMEOUT_SECONDS):
+                async with asyncio.TaskGroup() as tg:
+                    if conversation_id:
+                        messages_task = tg.create_task(
+                            ListMessages(conversation_id, offset)
+                        )
+                    bundle_task = tg.create_task(
+                        GetStateBundle(state.state_bundle_etag)
+                    )
+        except TimeoutError:
+            # Keep the state from the last refresh that completed.
+            print('Timed out updating state')
+            return
+        if messages_task:
+            messages = messages_task.result()
+            synced = state.messages[:offset]
+            synced.extend(map(convert_message_to_state, messages))
+            state.messages = synced
+            state.synced_conversation_id = conversation_id
+            state.synced_message_count = offset + len(messages)
+        bundle, state.state_bundle_etag = bundle_task.result()
+        # Nothing changed on the server since the last refresh.
+        if bundle is None:
+            return
+        # Fields the server could not read are None; keep the previous values.
+        if bundle.conversations is not None:
+            state.conversations = list(
+                map(convert_conversation_to_state, bundle.conversations)
+            )
+        if bundle.tasks is not None:
+            # Built off to the side and assigned once, rather than appended
+            # to the state list one task at a time.
+            state.task_list = [
                 SessionTask(
                     context_id=extract_conversation_id(task),
                     task=convert_task_to_state(task),
                 )
-            )
-        state.background_tasks = await GetProcessingMessages()
+                for task in bundle.tasks
+            ]
+        if bundle.pending_messages is not None:
+            state.background_tasks = bundle.pending_messages
         state.message_aliases = GetMessageAliases()
     except Exception as e:
         print('Failed to update state: ', e)
@@ -168,18 +242,14 @@ async def UpdateAppState(state: AppState, conversation_id: str):
 
 async def UpdateApiKey(api_key: str):
     """Update the API key"""
-    import httpx
-
+    global env_api_key
     try:
         # Set the environment variable
         os.environ['GOOGLE_API_KEY'] = api_key
+        env_api_key = api_key
 
         # Call the update API endpoint
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f'{server_url}/api_key/update', json={'api_key': api_key}
-            )
-            response.raise_for_status()
+        await _get_client().update_api_key(api_key)
         return True
     except Exception as e:
         print('Failed to update API key: ', e)
@@ -192,8 +262,8 @@ def convert_message_to_state(message: Message) -> StateMessage:
 
     return StateMessage(
         message_id=message.message_id,
-        context_id=message.context_id if message.context_id else '',
-        task_id=message.task_id if message.task_id else '',
+        context_id=message.context_id or '',
+        task_id=message.task_id or '',
         role=message.role.name,
         content=extract_content(message.parts),
     )
@@ -206,17 +276,13 @@ def convert_conversation_to_state(
         conversation_id=conversation.conversation_id,
         conversation_name=conversation.name,
         is_active=conversation.is_active,
-        message_ids=[extract_message_id(x) for x in conversation.messages],
+        message_ids=list(map(extract_message_id, conversation.messages)),
     )
 
 
 def convert_task_to_state(task: Task) -> StateTask:
     # Get the first message as the description
-    output = (
-        [extract_content(a.parts) for a in task.artifacts]
-        if task.artifacts
-        else []
-    )
+    output = [extract_content(a.parts) for a in task.artifacts or ()]
     if not task.history:
         return StateTask(
             task_id=task.id,
@@ -232,9 +298,9 @@ def convert_task_to_state(task: Task) -> StateTask:
             artifacts=output,
         )
     message = task.history[0]
-    last_message = task.history[-1]
-    if last_message != message:
-        output = [extract_content(last_message.parts)] + output
+    # A length check, not message equality, which compares the whole models.
+    if len(task.history) > 1:
+        output.insert(0, extract_content(task.history[-1].parts))
     return StateTask(
         task_id=task.id,
         context_id=task.context_id,
@@ -270,24 +336,26 @@ def extract_content(
             else:
                 parts.append((p.file.uri, p.file.mime_type or ''))
         elif p.kind == 'data':
+            data = p.data
+            # Forms are rendered from the dict itself, so only serialize
+            # the data that is shown as JSON.
+            if isinstance(data, dict) and data.get('type') == 'form':
+                parts.append((data, 'form'))
+                continue
             try:
-                jsonData = json.dumps(p.data)
-                if 'type' in p.data and p.data['type'] == 'form':
-                    parts.append((p.data, 'form'))
-                else:
-                    parts.append((jsonData, 'application/json'))
+                parts.append((to_json(data).decode(), 'application/json'))
             except Exception as e:
                 print('Failed to dump data', e)
                 parts.append(('<data>', 'text/plain'))
     return parts
 
 
-def extract_message_id(message: Message) -> str:
-    return message.message_id
+# A C-level getter; this runs for every message of every conversation.
+extract_message_id = operator.attrgetter('message_id')
 
 
 def extract_message_conversation(message: Message) -> str:
-    return message.context_id if message.context_id else ''
+    return message.context_id or ''
 
 
 def extract_conversation_id(task: Task) -> str:
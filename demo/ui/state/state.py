@@ -10,7 +10,7 @@ from pydantic.dataclasses import dataclass
 ContentPart = str | dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class StateConversation:
     """StateConversation provides mesop state compliant view of a conversation"""
 
@@ -20,7 +20,7 @@ class StateConversation:
     message_ids: list[str] = dataclasses.field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class StateMessage:
     """StateMessage provides mesop state compliant view of a message"""
 
@@ -34,7 +34,7 @@ class StateMessage:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class StateTask:
     """StateTask provides mesop state compliant view of task"""
 
@@ -47,7 +47,7 @@ class StateTask:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionTask:
     """SessionTask organizes tasks based on conversation"""
 
@@ -55,7 +55,7 @@ class SessionTask:
     task: StateTask = dataclasses.field(default_factory=StateTask)
 
 
-@dataclass
+@dataclass(slots=True)
 class StateEvent:
     """StateEvent provides mesop state compliant view of event"""
 
@@ -79,6 +79,12 @@ class AppState:
     current_conversation_id: str = ''
     conversations: list[StateConversation]
     messages: list[StateMessage]
+    # Conversation and count of the messages last fetched from the server, so
+    # a refresh only needs to fetch the messages added since.
+    synced_conversation_id: str = ''
+    synced_message_count: int = 0
+    # ETag of the last state bundle applied; unchanged bundles are skipped
+    state_bundle_etag: str = ''
     task_list: list[SessionTask] = dataclasses.field(default_factory=list)
     background_tasks: dict[str, str] = dataclasses.field(default_factory=dict)
     message_aliases: dict[str, str] = dataclasses.field(default_factory=dict)
@@ -89,6 +95,8 @@ class AppState:
     # This is used to track the message sent to agent with form data
     form_responses: dict[str, str] = dataclasses.field(default_factory=dict)
     polling_interval: int = 1
+    # Bumped after every poll refresh so the poller knows the last one landed
+    refresh_count: int = 0
 
     # Added for API key management
     api_key: str = ''
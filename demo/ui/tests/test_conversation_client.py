@@ -0,0 +1,57 @@
+import unittest
+
+import httpx
+
+from service.client.client import ConversationClient
+from service.types import GetStateBundleRequest, StateBundle
+
+
+class ConversationClientTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for ConversationClient class.
+
+    This test suite verifies the conditional state bundle request against a
+    mocked transport.
+    """
+
+    async def asyncSetUp(self) -> None:
+        """Set up a client whose server returns a fixed ETag."""
+        self.etag = '"abc"'
+        self.requests: list[httpx.Request] = []
+        self.body = (
+            '{"jsonrpc": "2.0", "id": "1", "result": '
+            + StateBundle(conversations=[]).model_dump_json()
+            + '}'
+        )
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            headers = {'ETag': self.etag}
+            if request.headers.get('If-None-Match') == self.etag:
+                return httpx.Response(304, headers=headers)
+            return httpx.Response(200, headers=headers, text=self.body)
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        self.addAsyncCleanup(http_client.aclose)
+        self.client = ConversationClient('http://test', http_client)
+
+    async def test_get_state_bundle(self) -> None:
+        """Test a first request decodes the bundle and returns its ETag."""
+        response, etag = await self.client.get_state_bundle(
+            GetStateBundleRequest()
+        )
+        self.assertEqual(etag, self.etag)
+        self.assertEqual(response.result.conversations, [])
+        self.assertNotIn('If-None-Match', self.requests[0].headers)
+
+    async def test_get_state_bundle_not_modified(self) -> None:
+        """Test a 304 returns no bundle and keeps the ETag."""
+        response, etag = await self.client.get_state_bundle(
+            GetStateBundleRequest(), self.etag
+        )
+        self.assertIsNone(response)
+        self.assertEqual(etag, self.etag)
+        self.assertEqual(self.requests[0].headers['If-None-Match'], self.etag)
+
+
+if __name__ == '__main__':
+    unittest.main()
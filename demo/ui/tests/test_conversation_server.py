@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+import unittest
+
+from unittest import mock
+
+import httpx
+
+from a2a.types import Message, Part, Role, TextPart
+from fastapi import FastAPI
+from service.server.server import (
+    RESPONSE_CACHE_TTL_SECONDS,
+    ConversationServer,
+)
+
+
+class ConversationServerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for ConversationServer class.
+
+    This test suite verifies the ETag handling of cached poll responses, the
+    state change watcher and listing only the messages after an offset.
+    """
+
+    async def asyncSetUp(self) -> None:
+        """Set up a server backed by the in-memory manager."""
+        app = FastAPI()
+        http_client = httpx.AsyncClient()
+        self.addAsyncCleanup(http_client.aclose)
+        with mock.patch.dict(os.environ, {'A2A_HOST': 'memory'}):
+            self.server = ConversationServer(app, http_client)
+        self.addAsyncCleanup(self.server.close)
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url='http://test'
+        )
+        self.addAsyncCleanup(self.client.aclose)
+
+    async def test_state_bundle_has_etag(self) -> None:
+        """Test a response carries the ETag of its content."""
+        response = await self.client.post(
+            '/state/bundle', json={'method': 'state/bundle'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['ETag'])
+        self.assertTrue(response.json()['result'])
+
+    async def test_matching_etag_gets_not_modified(self) -> None:
+        """Test a request with the current ETag gets an empty 304."""
+        first = await self.client.post(
+            '/state/bundle', json={'method': 'state/bundle'}
+        )
+        etag = first.headers['ETag']
+        response = await self.client.post(
+            '/state/bundle',
+            json={'method': 'state/bundle'},
+            headers={'If-None-Match': etag},
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    async def test_etag_survives_cache_expiry(self) -> None:
+        """Test an unchanged state keeps its ETag after the cache tick ends."""
+        first = await self.client.post(
+            '/state/bundle', json={'method': 'state/bundle'}
+        )
+        monotonic = time.monotonic
+        with mock.patch.object(
+            time,
+            'monotonic',
+            lambda: monotonic() + RESPONSE_CACHE_TTL_SECONDS + 1,
+        ):
+            response = await self.client.post(
+                '/state/bundle',
+                json={'method': 'state/bundle'},
+                headers={'If-None-Match': first.headers['ETag']},
+            )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_stale_etag_gets_content(self) -> None:
+        """Test a request with an old ETag gets the full response."""
+        response = await self.client.post(
+            '/state/bundle',
+            json={'method': 'state/bundle'},
+            headers={'If-None-Match': '"stale"'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], '"stale"')
+        self.assertTrue(response.content)
+
+    async def test_resubscribe_while_watcher_runs(self) -> None:
+        """Test a subscriber that replaces the last one still gets the ETag."""
+        hub = self.server._state_hub
+        with hub.subscribe() as first:
+            self.server._state_watcher = asyncio.create_task(
+                self.server._watch_state()
+            )
+            etag = await asyncio.wait_for(first.get(), 1)
+        # The watcher is still sleeping when the next subscriber arrives.
+        with hub.subscribe() as second:
+            self.assertFalse(self.server._state_watcher.done())
+            self.assertEqual(
+                await asyncio.wait_for(
+                    second.get(), RESPONSE_CACHE_TTL_SECONDS + 1
+                ),
+                etag,
+            )
+        await self.server._state_watcher
+
+    async def test_close_stops_watcher(self) -> None:
+        """Test closing cancels a running watcher and stops the encoder."""
+        with self.server._state_hub.subscribe():
+            watcher = asyncio.create_task(self.server._watch_state())
+            self.server._state_watcher = watcher
+            await asyncio.sleep(0)
+            await self.server.close()
+        self.assertTrue(watcher.cancelled())
+        with self.assertRaises(RuntimeError):
+            self.server._encoder.submit(int)
+
+    async def test_list_messages_from_offset(self) -> None:
+        """Test listing with an offset returns only the later messages."""
+        conversation = self.server.manager.create_conversation()
+        conversation.messages.extend(
+            Message(
+                message_id=f'message-{i}',
+                role=Role.user,
+                parts=[Part(root=TextPart(text=f'text {i}'))],
+            )
+            for i in range(3)
+        )
+        response = await self.client.post(
+            '/message/list',
+            json={
+                'method': 'message/list',
+                'params': {
+                    'conversation_id': conversation.conversation_id,
+                    'offset': 1,
+                },
+            },
+        )
+        self.assertEqual(
+            [m['messageId'] for m in response.json()['result']],
+            ['message-1', 'message-2'],
+        )
+
+    async def test_list_messages_rejects_negative_offset(self) -> None:
+        """Test a negative offset is an invalid params error."""
+        conversation = self.server.manager.create_conversation()
+        response = await self.client.post(
+            '/message/list',
+            json={
+                'method': 'message/list',
+                'params': {
+                    'conversation_id': conversation.conversation_id,
+                    'offset': -1,
+                },
+            },
+        )
+        self.assertIsNone(response.json()['result'])
+        self.assertEqual(response.json()['error']['code'], -32602)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from unittest import mock
+
+from a2a.types import Message, Part, Role, TextPart
+from state import host_agent_service
+from state.state import AppState, StateMessage
+
+
+def make_message(message_id: str) -> Message:
+    return Message(
+        message_id=message_id,
+        role=Role.user,
+        parts=[Part(root=TextPart(text=message_id))],
+    )
+
+
+class UpdateAppStateTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for UpdateAppState.
+
+    This test suite verifies that a refresh only fetches the messages added
+    since the last sync and appends them to the ones already held.
+    """
+
+    def setUp(self) -> None:
+        """Set up a state synced to two messages of a conversation."""
+        self.state = AppState(
+            conversations=[],
+            messages=[
+                StateMessage(message_id='message-0'),
+                StateMessage(message_id='message-1'),
+            ],
+            synced_conversation_id='conversation',
+            synced_message_count=2,
+        )
+        self.list_messages = self.enterContext(
+            mock.patch.object(
+                host_agent_service,
+                'ListMessages',
+                mock.AsyncMock(return_value=[make_message('message-2')]),
+            )
+        )
+        self.enterContext(
+            mock.patch.object(
+                host_agent_service,
+                'GetStateBundle',
+                mock.AsyncMock(return_value=(None, '"etag"')),
+            )
+        )
+
+    async def test_appends_tail_to_synced_messages(self) -> None:
+        """Test only the new messages are fetched and appended."""
+        await host_agent_service.UpdateAppState(self.state, 'conversation')
+        self.list_messages.assert_awaited_once_with('conversation', 2)
+        self.assertEqual(
+            [m.message_id for m in self.state.messages],
+            ['message-0', 'message-1', 'message-2'],
+        )
+        self.assertEqual(self.state.synced_message_count, 3)
+
+    async def test_conversation_switch_fetches_all(self) -> None:
+        """Test switching conversations replaces the messages."""
+        await host_agent_service.UpdateAppState(self.state, 'other')
+        self.list_messages.assert_awaited_once_with('other', 0)
+        self.assertEqual(
+            [m.message_id for m in self.state.messages], ['message-2']
+        )
+        self.assertEqual(self.state.synced_conversation_id, 'other')
+        self.assertEqual(self.state.synced_message_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
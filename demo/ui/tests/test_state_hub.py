@@ -0,0 +1,57 @@
+import unittest
+
+from service.server.state_hub import StateHub
+
+
+class StateHubTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for StateHub class.
+
+    This test suite verifies fan-out to subscribers, the bounded per-subscriber
+    queues and the replay of the latest message to new subscribers.
+    """
+
+    async def test_publish_reaches_every_subscriber(self) -> None:
+        """Test a published message is queued for each subscriber."""
+        hub = StateHub()
+        with hub.subscribe() as first, hub.subscribe() as second:
+            self.assertEqual(hub.subscriber_count, 2)
+            hub.publish('a')
+            self.assertEqual(await first.get(), 'a')
+            self.assertEqual(await second.get(), 'a')
+        self.assertEqual(hub.subscriber_count, 0)
+
+    async def test_slow_subscriber_drops_oldest(self) -> None:
+        """Test a full queue drops its oldest message instead of growing."""
+        hub = StateHub(maxsize=2)
+        with hub.subscribe() as updates:
+            for message in ('a', 'b', 'c'):
+                hub.publish(message)
+            self.assertEqual(updates.qsize(), 2)
+            self.assertEqual(await updates.get(), 'b')
+            self.assertEqual(await updates.get(), 'c')
+
+    async def test_new_subscriber_gets_latest(self) -> None:
+        """Test a new subscriber starts with the latest published message."""
+        hub = StateHub()
+        with hub.subscribe() as updates:
+            self.assertTrue(updates.empty())
+        hub.publish('a')
+        hub.publish('b')
+        with hub.subscribe() as updates:
+            self.assertEqual(updates.qsize(), 1)
+            self.assertEqual(await updates.get(), 'b')
+
+    async def test_latest_cleared_without_subscribers(self) -> None:
+        """Test the latest message is forgotten when the last one leaves."""
+        hub = StateHub()
+        with hub.subscribe():
+            with hub.subscribe():
+                hub.publish('a')
+            self.assertEqual(hub.latest, 'a')
+        self.assertIsNone(hub.latest)
+        with hub.subscribe() as updates:
+            self.assertTrue(updates.empty())
+
+
+if __name__ == '__main__':
+    unittest.main()